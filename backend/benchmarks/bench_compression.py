@@ -0,0 +1,116 @@
+"""
+Bytes-on-the-wire benchmark for response compression and conditional GET.
+
+Builds payloads shaped like the real history / roadmap / CV review responses and
+reports raw, gzip and brotli sizes as FastAPI would send them.
+
+    python -m backend.benchmarks.bench_compression
+"""
+import json
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from backend.core.compression import available_encodings, compress
+
+random.seed(7)
+
+WORDS = (
+    "pengalaman kerja tim proyek analisis data aplikasi mobile backend komunikasi "
+    "kepemimpinan sertifikasi python kotlin sql cloud desain sistem pengujian "
+    "dokumentasi presentasi stakeholder perusahaan startup magang kampus organisasi"
+).split()
+
+
+def sentence(n: int) -> str:
+    return " ".join(random.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def cv_review() -> dict:
+    return {
+        "review_id": str(uuid.uuid4()),
+        "job_field": "Teknologi Informasi",
+        "target_role": "Android Developer",
+        "language": "id",
+        "overall_score": random.randint(40, 95),
+        "rating_label": "Baik",
+        "summary": " ".join(sentence(14) for _ in range(5)),
+        "strengths": [sentence(10) for _ in range(4)],
+        "weaknesses": [sentence(10) for _ in range(4)],
+        "recommendations": [sentence(12) for _ in range(5)],
+        "suggested_career_paths": None,
+    }
+
+
+def roadmap() -> dict:
+    return {
+        "roadmap_id": str(uuid.uuid4()),
+        "job_field": "Teknologi Informasi",
+        "target_role": "Data Analyst",
+        "current_level": "ENTRY",
+        "stages": [
+            {
+                "id": f"s{i}",
+                "title": sentence(3),
+                "description": " ".join(sentence(12) for _ in range(2)),
+                "estimated_duration_months": random.randint(1, 6),
+                "skills_to_learn": [random.choice(WORDS) for _ in range(5)],
+                "resources": [
+                    {"title": sentence(4), "url": f"https://example.com/kursus/{uuid.uuid4()}", "type": "COURSE"}
+                    for _ in range(4)
+                ],
+            }
+            for i in range(1, 6)
+        ],
+    }
+
+
+def history(n: int) -> list:
+    now = datetime(2025, 11, 1)
+    makers = [("cv_review", cv_review), ("career_roadmap", roadmap)]
+    items = []
+    for i in range(n):
+        type_, make = makers[i % len(makers)]
+        items.append({
+            "id": str(uuid.uuid4()),
+            "type": type_,
+            "data": make(),
+            "created_at": (now - timedelta(hours=i)).isoformat(),
+        })
+    return items
+
+
+def encode(payload) -> bytes:
+    # Same serialization as starlette's JSONResponse
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def main() -> None:
+    encodings = available_encodings(["gzip", "br"])
+    payloads = {
+        "cv_review": cv_review(),
+        "roadmap": roadmap(),
+        "history (20 items)": history(20),
+        "history (100 items)": history(100),
+    }
+    header = f"{'payload':<22}{'raw':>10}" + "".join(f"{enc:>10}{'saved':>8}" for enc in encodings)
+    print(header)
+    print("-" * len(header))
+    for name, payload in payloads.items():
+        raw = encode(payload)
+        row = f"{name:<22}{len(raw):>10}"
+        for enc in encodings:
+            size = len(compress(raw, enc))
+            row += f"{size:>10}{1 - size / len(raw):>8.0%}"
+        print(row)
+    if "br" not in encodings:
+        print("(brotli not installed; only gzip measured)")
+
+    raw = encode(payloads["history (100 items)"])
+    print()
+    print(f"Unchanged history revalidation: 304 with empty body instead of {len(raw)} bytes raw / "
+          f"{len(compress(raw, encodings[-1]))} bytes {encodings[-1]}.")
+
+
+if __name__ == "__main__":
+    main()
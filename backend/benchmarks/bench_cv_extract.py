@@ -0,0 +1,105 @@
+"""
+Compare CV text extraction backends on the bundled corpus (benchmarks/cv_corpus).
+
+For each backend, reported per run over the whole corpus:
+- pages/s      extraction throughput (after one warm-up pass)
+- peak RSS     growth of the process's max RSS while extracting (library import
+               excluded), in MiB
+- words        share of reference words recovered
+- lines        share of reference lines (3+ words) recovered intact, in reading
+               order; low values mean columns were interleaved
+- chars        average extracted characters per CV
+
+Each backend runs in its own process so memory numbers don't bleed together.
+
+    python -m backend.benchmarks.bench_cv_extract [--rounds 20]
+"""
+import argparse
+import multiprocessing
+import resource
+import time
+from collections import Counter
+
+from backend.benchmarks.cv_corpus.make_corpus import CORPUS_DIR, reference_text
+from backend.services.cv_extract import EXTRACTORS, get_extractor
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+def yield_scores(extracted: str, reference: str) -> tuple[float, float]:
+    ref_words = Counter(_normalize(reference).split())
+    got_words = Counter(_normalize(extracted).split())
+    word_recall = sum((ref_words & got_words).values()) / max(1, sum(ref_words.values()))
+
+    flat = _normalize(extracted)
+    lines = [_normalize(line) for line in reference.splitlines() if len(line.split()) >= 3]
+    line_recall = sum(1 for line in lines if line in flat) / max(1, len(lines))
+    return word_recall, line_recall
+
+
+def load_corpus() -> list[tuple[str, bytes, str]]:
+    corpus = []
+    for pdf in sorted(CORPUS_DIR.glob("*.pdf")):
+        source = pdf.with_suffix(".txt").read_text(encoding="utf-8")
+        corpus.append((pdf.name, pdf.read_bytes(), reference_text(source)))
+    return corpus
+
+
+def _run_backend(name: str, rounds: int, results) -> None:
+    try:
+        extractor = get_extractor(name)  # imports the library
+        corpus = load_corpus()
+        pages = sum(extractor.page_count(data) for _, data, _ in corpus)
+    except ImportError as e:
+        results.put((name, {"error": f"not installed ({e.name})"}))
+        return
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    outputs = [extractor.extract(data) for _, data, _ in corpus]  # warm-up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for _, data, _ in corpus:
+            extractor.extract(data)
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    scores = [yield_scores(text, ref) for text, (_, _, ref) in zip(outputs, corpus)]
+    results.put((name, {
+        "pages_per_sec": pages * rounds / elapsed,
+        "peak_rss_mib": (rss_after - rss_before) / 1024,  # ru_maxrss is KiB on Linux
+        "word_recall": sum(s[0] for s in scores) / len(scores),
+        "line_recall": sum(s[1] for s in scores) / len(scores),
+        "avg_chars": sum(len(t) for t in outputs) / len(outputs),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--backends", nargs="*", default=list(EXTRACTORS))
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    print(f"Corpus: {len(corpus)} CVs from {CORPUS_DIR}, {args.rounds} rounds\n")
+    print(f"{'backend':<11}{'pages/s':>10}{'peak RSS':>10}{'words':>8}{'lines':>8}{'chars':>8}")
+
+    ctx = multiprocessing.get_context("spawn")
+    for name in args.backends:
+        results = ctx.Queue()
+        proc = ctx.Process(target=_run_backend, args=(name, args.rounds, results))
+        proc.start()
+        _, r = results.get()
+        proc.join()
+        if "error" in r:
+            print(f"{name:<11}{r['error']}")
+            continue
+        print(
+            f"{name:<11}{r['pages_per_sec']:>10.1f}{r['peak_rss_mib']:>9.1f}M"
+            f"{r['word_recall']:>8.0%}{r['line_recall']:>8.0%}{r['avg_chars']:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Wall-clock time of interview question generation, single call vs sharded.
+
+Starts the Gemini stub (benchmarks/gemini_stub.py) in-process, so no API key
+is needed; tune its latency model with the STUB_* environment variables.
+
+    python -m backend.benchmarks.bench_interview_sharding [--rounds 3]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import threading
+import time
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_stub(port: int) -> None:
+    import uvicorn
+
+    from backend.benchmarks.gemini_stub import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+
+async def _time(service, req, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await service.interview_questions(req)
+    return (time.perf_counter() - start) / rounds
+
+
+async def run(rounds: int) -> None:
+    from backend.core.config import settings
+    from backend.schemas import InterviewQuestionsRequest
+    from backend.services.ai import AIService
+
+    service = AIService()
+    shard_size = settings.interview_shard_size
+    print(f"{'questions':<11}{'single call':>13}{'sharded':>10}")
+    for n in (3, 5, 10):
+        req = InterviewQuestionsRequest(job_field="Teknologi Informasi", difficulty="Junior", num_questions=n)
+        settings.interview_shard_size = 1000
+        single = await _time(service, req, rounds)
+        settings.interview_shard_size = shard_size
+        sharded = await _time(service, req, rounds)
+        print(f"{n:<11}{single:>12.2f}s{sharded:>9.2f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    port = _free_port()
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ["GEMINI_BASE_URL"] = f"http://127.0.0.1:{port}/v1beta"
+    os.environ["GEMINI_API_KEY"] = "stub"
+    _start_stub(port)
+    asyncio.run(run(args.rounds))
+
+
+if __name__ == "__main__":
+    main()
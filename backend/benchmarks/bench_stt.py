@@ -0,0 +1,112 @@
+"""
+Real-time factor and word error rate per STT decoding profile.
+
+Runs every clip listed in benchmarks/stt_samples/manifest.jsonl through each
+profile in-process and reports:
+- RTF   processing time / audio duration (lower is faster; < 1 is faster than real time)
+- WER   word error rate against the reference transcript
+
+Models are loaded and warmed up before timing. Profile models follow the
+usual STT_* environment variables, e.g. STT_FAST_MODEL_ID.
+
+From the measured RTF it also suggests the "auto" clip-length thresholds:
+the longest clip each profile transcribes within --latency-budget seconds.
+
+    python -m backend.benchmarks.bench_stt [--profiles fast accurate] [--latency-budget 15]
+"""
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+SAMPLES_DIR = Path(__file__).resolve().parent / "stt_samples"
+
+
+def normalize_words(text: str) -> list[str]:
+    return re.sub(r"[^\w\s]", " ", text.casefold()).split()
+
+
+def word_errors(hypothesis: str, reference: str) -> tuple[int, int]:
+    """
+    (substitutions + deletions + insertions, reference word count)
+    """
+    hyp, ref = normalize_words(hypothesis), normalize_words(reference)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            )
+        previous = current
+    return previous[-1], len(ref)
+
+
+def load_samples() -> list[tuple[str, bytes, str]]:
+    samples = []
+    with open(SAMPLES_DIR / "manifest.jsonl", encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            path = SAMPLES_DIR / entry["audio"]
+            if path.exists():
+                samples.append((entry["audio"], path.read_bytes(), entry["text"]))
+            else:
+                print(f"skip {entry['audio']}: file not found", file=sys.stderr)
+    return samples
+
+
+def main() -> None:
+    os.environ.pop("STT_SOCKET_PATH", None)  # always benchmark in-process
+    from faster_whisper.audio import decode_audio
+    from backend.services import stt
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", nargs="*", default=list(stt.PROFILES))
+    parser.add_argument("--latency-budget", type=float, default=15.0, help="seconds a user should wait for a transcript")
+    args = parser.parse_args()
+
+    samples = load_samples()
+    if not samples:
+        sys.exit(f"No audio clips found in {SAMPLES_DIR}; see README.md there.")
+    durations = [
+        len(decode_audio(io.BytesIO(audio), sampling_rate=stt.SAMPLING_RATE)) / stt.SAMPLING_RATE
+        for _, audio, _ in samples
+    ]
+    print(f"{len(samples)} clips, {sum(durations):.1f}s of audio\n")
+    print(f"{'profile':<10}{'model':<36}{'compute':<10}{'RTF':>7}{'WER':>8}")
+
+    rtfs = {}
+    for name in args.profiles:
+        profile = stt.PROFILES[name]
+        stt.transcribe_local(samples[0][1], profile=name)  # load + warm up
+        errors = words = 0
+        elapsed = 0.0
+        for _, audio, reference in samples:
+            start = time.perf_counter()
+            text = stt.transcribe_local(audio, profile=name)
+            elapsed += time.perf_counter() - start
+            e, n = word_errors(text, reference)
+            errors += e
+            words += n
+        rtfs[name] = elapsed / sum(durations)
+        print(
+            f"{name:<10}{profile.model_id:<36}{profile.compute_type:<10}"
+            f"{rtfs[name]:>7.3f}{errors / max(1, words):>8.1%}"
+        )
+
+    if "accurate" in rtfs and "balanced" in rtfs:
+        print(f"\nSuggested thresholds for a {args.latency_budget:g}s latency budget:")
+        print(f"STT_AUTO_SHORT_CLIP_SEC={args.latency_budget / rtfs['accurate']:.0f}")
+        print(f"STT_AUTO_LONG_CLIP_SEC={args.latency_budget / rtfs['balanced']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
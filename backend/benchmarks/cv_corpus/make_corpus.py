@@ -0,0 +1,151 @@
+"""
+Render the sample CV sources (*.txt) in this directory into PDFs.
+
+Sources start with `layout:`, `name:` and `title:` lines. Two-column CVs put a
+narrow sidebar under `== left ==` and the main body under `== right ==`.
+`## ` lines are section headings. Every page gets a repeated header/footer,
+like most CV templates.
+
+    python -m backend.benchmarks.cv_corpus.make_corpus
+
+Only the standard library is used, so the corpus can be rebuilt anywhere.
+"""
+from pathlib import Path
+
+CORPUS_DIR = Path(__file__).resolve().parent
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN_TOP, MARGIN_BOTTOM = 100, 70
+BODY_SIZE, HEADING_SIZE = 11, 13
+LEADING = 14
+
+
+def parse_source(text: str) -> dict:
+    meta, columns, current = {}, {"main": [], "left": [], "right": []}, "main"
+    for line in text.splitlines():
+        line = line.rstrip()
+        if line.startswith("== ") and line.endswith(" =="):
+            current = line[3:-3].strip()
+        elif ":" in line and not columns[current] and line.split(":", 1)[0] in ("layout", "name", "title"):
+            key, value = line.split(":", 1)
+            meta[key] = value.strip()
+        elif line:
+            columns[current].append(line)
+    return {**meta, **columns}
+
+
+def reference_text(text: str) -> str:
+    """
+    Plain text a perfect extractor would recover (reading order: sidebar, then body).
+    """
+    src = parse_source(text)
+    lines = [src["name"], src["title"], *src["main"], *src["left"], *src["right"]]
+    return "\n".join(line.removeprefix("## ") for line in lines)
+
+
+def _wrap(line: str, width_pt: float, size: int) -> list[str]:
+    max_chars = max(10, int(width_pt / (size * 0.5)))  # rough Helvetica average glyph width
+    words, out, current = line.split(), [], ""
+    for word in words:
+        candidate = f"{current} {word}".strip()
+        if len(candidate) > max_chars and current:
+            out.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        out.append(current)
+    return out
+
+
+def _layout_column(lines: list[str], width_pt: float) -> list[tuple[str, int, bool]]:
+    """
+    Wrap a column into (text, font size, bold) rows.
+    """
+    rows = []
+    for line in lines:
+        if line.startswith("## "):
+            rows.append(("", BODY_SIZE, False))
+            rows.append((line[3:], HEADING_SIZE, True))
+        else:
+            rows.extend((chunk, BODY_SIZE, False) for chunk in _wrap(line, width_pt, BODY_SIZE))
+    return rows
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _text_op(x: float, y: float, text: str, size: int, bold: bool) -> str:
+    font = "F2" if bold else "F1"
+    return f"BT /{font} {size} Tf {x:.0f} {y:.0f} Td ({_escape(text)}) Tj ET"
+
+
+def render_pages(src: dict) -> list[str]:
+    if src.get("layout") == "two-column":
+        columns = [(40, _layout_column(src["left"], 160)), (230, _layout_column(src["right"], 325))]
+    else:
+        columns = [(50, _layout_column(src["main"], 495))]
+    rows_per_page = int((PAGE_HEIGHT - MARGIN_TOP - MARGIN_BOTTOM) / LEADING)
+    page_count = max(-(-len(rows) // rows_per_page) for _, rows in columns)
+
+    pages = []
+    for page_no in range(page_count):
+        ops = [
+            _text_op(50, PAGE_HEIGHT - 45, src["name"], 16, True),
+            _text_op(50, PAGE_HEIGHT - 62, src["title"], 11, False),
+        ]
+        # Emit rows top to bottom across columns, as many CV templates do; extractors
+        # that follow content-stream order will interleave the columns.
+        for row in range(page_no * rows_per_page, (page_no + 1) * rows_per_page):
+            y = PAGE_HEIGHT - MARGIN_TOP - (row % rows_per_page) * LEADING
+            for x, rows in columns:
+                if row < len(rows) and rows[row][0]:
+                    text, size, bold = rows[row]
+                    ops.append(_text_op(x, y, text, size, bold))
+        ops.append(_text_op(50, 30, f"Curriculum Vitae - {src['name']} - Halaman {page_no + 1}", 8, False))
+        pages.append("\n".join(ops))
+    return pages
+
+
+def build_pdf(pages: list[str]) -> bytes:
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in below
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    kids = []
+    for content in pages:
+        stream = content.encode("latin-1")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{content}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
+
+
+def main() -> None:
+    for source in sorted(CORPUS_DIR.glob("*.txt")):
+        pages = render_pages(parse_source(source.read_text(encoding="utf-8")))
+        source.with_suffix(".pdf").write_bytes(build_pdf(pages))
+        print(f"{source.with_suffix('.pdf').name}: {len(pages)} page(s)")
+
+
+if __name__ == "__main__":
+    main()
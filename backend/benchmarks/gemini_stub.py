@@ -0,0 +1,126 @@
+"""
+Local stand-in for the Gemini REST API, for exercising AIService without a key.
+
+Implements `models/{model}:generateContent` (answers with fake data shaped by
+the request's response_schema) and `cachedContents` create/renew, with
+simulated latency:
+
+    base + prompt tokens not served from cache * STUB_PREFILL_MS_PER_1K / 1000
+         + output items * STUB_PER_ITEM_MS
+
+    uvicorn backend.benchmarks.gemini_stub:app --port 8090
+    GEMINI_BASE_URL=http://127.0.0.1:8090/v1beta GEMINI_API_KEY=stub ...
+
+GET /stats returns request counters.
+"""
+import asyncio
+import json
+import os
+import re
+import time
+import uuid
+
+from fastapi import FastAPI, HTTPException, Request
+
+BASE_MS = float(os.getenv("STUB_BASE_MS", "200"))
+PREFILL_MS_PER_1K = float(os.getenv("STUB_PREFILL_MS_PER_1K", "100"))
+PER_ITEM_MS = float(os.getenv("STUB_PER_ITEM_MS", "300"))
+MIN_CACHE_TOKENS = int(os.getenv("STUB_MIN_CACHE_TOKENS", "0"))
+
+app = FastAPI(title="Gemini stub")
+caches: dict[str, dict] = {}  # name -> {"text", "tokens", "expires"}
+stats = {"generate": 0, "generate_cached": 0, "cache_created": 0, "cache_renewed": 0}
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _parse_ttl(value: str | None) -> float:
+    return float((value or "3600s").rstrip("s"))
+
+
+def _fake(schema: dict, field: str, index: int, count: int, topic: str):
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            name: _fake(sub, name, index, count, topic)
+            for name, sub in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        n = count if field == "" else 2
+        return [_fake(schema.get("items", {}), field, i, count, topic) for i in range(1, n + 1)]
+    if kind == "number":
+        return 90 if field == "suggested_duration_sec" else 75
+    if field == "id":
+        return f"q{index}"
+    if field == "topic":
+        return topic
+    if field == "url":
+        return f"https://example.com/{uuid.uuid4().hex[:8]}"
+    return f"{field} {topic} {uuid.uuid4().hex[:10]}"
+
+
+@app.post("/v1beta/cachedContents")
+async def create_cache(body: dict):
+    text = "".join(p.get("text", "") for p in body.get("systemInstruction", {}).get("parts", []))
+    if _tokens(text) < MIN_CACHE_TOKENS:
+        raise HTTPException(status_code=400, detail="Cached content is too small")
+    name = f"cachedContents/{uuid.uuid4().hex[:12]}"
+    caches[name] = {"text": text, "tokens": _tokens(text), "expires": time.time() + _parse_ttl(body.get("ttl"))}
+    stats["cache_created"] += 1
+    return {"name": name, "model": body.get("model"), "usageMetadata": {"totalTokenCount": caches[name]["tokens"]}}
+
+
+@app.patch("/v1beta/cachedContents/{cache_id}")
+async def renew_cache(cache_id: str, body: dict):
+    entry = caches.get(f"cachedContents/{cache_id}")
+    if not entry or entry["expires"] < time.time():
+        raise HTTPException(status_code=404, detail="Cached content not found")
+    entry["expires"] = time.time() + _parse_ttl(body.get("ttl"))
+    stats["cache_renewed"] += 1
+    return {"name": f"cachedContents/{cache_id}"}
+
+
+@app.post("/v1beta/models/{model}:generateContent")
+async def generate_content(model: str, request: Request):
+    body = await request.json()
+    prompt = "".join(p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", []))
+    system = "".join(p.get("text", "") for p in body.get("system_instruction", {}).get("parts", []))
+    cached_tokens = 0
+    if body.get("cachedContent"):
+        if system:
+            raise HTTPException(status_code=400, detail="system_instruction not allowed with cachedContent")
+        entry = caches.get(body["cachedContent"])
+        if not entry or entry["expires"] < time.time():
+            raise HTTPException(status_code=404, detail="Cached content not found")
+        cached_tokens = entry["tokens"]
+        stats["generate_cached"] += 1
+    stats["generate"] += 1
+
+    count_match = re.search(r"Buat (\d+) pertanyaan", prompt)
+    count = int(count_match.group(1)) if count_match else 3
+    topic_match = re.search(r"[Tt]opik:?\s+(\w+)", prompt)
+    topic = topic_match.group(1) if topic_match else "Technical"
+    schema = body.get("generationConfig", {}).get("response_schema") or {"type": "string"}
+    output = _fake(schema, "", 1, count, topic)
+    items = count if schema.get("type") == "array" else 1
+
+    uncached_prompt_tokens = _tokens(prompt) + (_tokens(system) if system else 0)
+    await asyncio.sleep((BASE_MS + uncached_prompt_tokens * PREFILL_MS_PER_1K / 1000 + items * PER_ITEM_MS) / 1000)
+
+    text = json.dumps(output, ensure_ascii=False)
+    return {
+        "candidates": [{"content": {"parts": [{"text": text}]}}],
+        "usageMetadata": {
+            "promptTokenCount": uncached_prompt_tokens + cached_tokens,
+            "cachedContentTokenCount": cached_tokens,
+            "candidatesTokenCount": _tokens(text),
+            "totalTokenCount": uncached_prompt_tokens + cached_tokens + _tokens(text),
+        },
+    }
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
@@ -0,0 +1,105 @@
+"""
+Synthesize the Indonesian answers in manifest.jsonl into the WAV clips next to it.
+
+Speech comes from eSpeak NG's Indonesian voice (`pip install espeakng-loader`,
+which bundles the library and voice data), cycling through voice variants and
+speaking rates, and is written as 16 kHz mono 16-bit WAV with a short silence
+on both ends.
+
+Synthetic speech is cleaner and flatter than a candidate talking into a phone,
+so WER on these clips is optimistic. RTF mostly depends on clip length and the
+decoding profile, so it carries over; replace or extend the set with real
+recordings when available (same file names, or new manifest lines).
+
+    python -m backend.benchmarks.stt_samples.make_samples
+"""
+import ctypes
+import json
+import wave
+from pathlib import Path
+
+SAMPLES_DIR = Path(__file__).resolve().parent
+SAMPLING_RATE = 16000
+PADDING_SEC = 0.3
+# (voice, words per minute); eSpeak's default rate is 175
+VOICES = [("id", 160), ("id+f2", 150), ("id+m3", 170), ("id+f4", 155)]
+
+_AUDIO_OUTPUT_SYNCHRONOUS = 2
+_POS_CHARACTER = 1
+_CHARS_UTF8 = 1
+_RATE = 1
+_SYNTH_CALLBACK = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.POINTER(ctypes.c_short), ctypes.c_int, ctypes.c_void_p)
+
+
+class Synthesizer:
+    def __init__(self) -> None:
+        import espeakng_loader
+
+        self.lib = ctypes.CDLL(espeakng_loader.get_library_path())
+        self.rate = self.lib.espeak_Initialize(
+            _AUDIO_OUTPUT_SYNCHRONOUS, 0, espeakng_loader.get_data_path().encode(), 0
+        )
+        if self.rate <= 0:
+            raise RuntimeError("eSpeak NG failed to initialize")
+        self._samples: list[int] = []
+        # Keep a reference: eSpeak calls back into it for every synthesized chunk
+        self._callback = _SYNTH_CALLBACK(self._collect)
+        self.lib.espeak_SetSynthCallback(self._callback)
+
+    def _collect(self, wav, count, events) -> int:
+        if wav and count > 0:
+            self._samples.extend(wav[:count])
+        return 0
+
+    def speak(self, text: str, voice: str, words_per_minute: int) -> list[int]:
+        if self.lib.espeak_SetVoiceByName(voice.encode()) != 0:
+            raise RuntimeError(f"eSpeak NG voice '{voice}' not available")
+        self.lib.espeak_SetParameter(_RATE, words_per_minute, 0)
+        self._samples = []
+        data = text.encode("utf-8")
+        self.lib.espeak_Synth(data, len(data) + 1, 0, _POS_CHARACTER, 0, _CHARS_UTF8, None, None)
+        self.lib.espeak_Synchronize()
+        return self._samples
+
+
+def resample(samples: list[int], source_rate: int, target_rate: int) -> list[int]:
+    """
+    Linear interpolation; plenty for speech going down to 16 kHz.
+    """
+    if source_rate == target_rate or not samples:
+        return samples
+    step = source_rate / target_rate
+    out = []
+    last = len(samples) - 1
+    for i in range(int(len(samples) / step)):
+        pos = i * step
+        j = int(pos)
+        frac = pos - j
+        nxt = samples[min(j + 1, last)]
+        out.append(int(samples[j] + (nxt - samples[j]) * frac))
+    return out
+
+
+def write_wav(path: Path, samples: list[int]) -> None:
+    padding = [0] * int(PADDING_SEC * SAMPLING_RATE)
+    pcm = b"".join(s.to_bytes(2, "little", signed=True) for s in padding + samples + padding)
+    with wave.open(str(path), "wb") as fh:
+        fh.setnchannels(1)
+        fh.setsampwidth(2)
+        fh.setframerate(SAMPLING_RATE)
+        fh.writeframes(pcm)
+
+
+def main() -> None:
+    synth = Synthesizer()
+    with open(SAMPLES_DIR / "manifest.jsonl", encoding="utf-8") as fh:
+        entries = [json.loads(line) for line in fh if line.strip()]
+    for i, entry in enumerate(entries):
+        voice, wpm = VOICES[i % len(VOICES)]
+        samples = resample(synth.speak(entry["text"], voice, wpm), synth.rate, SAMPLING_RATE)
+        write_wav(SAMPLES_DIR / entry["audio"], samples)
+        print(f"{entry['audio']}: {len(samples) / SAMPLING_RATE:.1f}s ({voice}, {wpm} wpm)")
+
+
+if __name__ == "__main__":
+    main()
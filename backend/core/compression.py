@@ -0,0 +1,149 @@
+import gzip
+from typing import Iterable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.core.http_cache import etag_for_encoding
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def available_encodings(preferred: Iterable[str]) -> tuple[str, ...]:
+    """
+    Keep the configured encodings this interpreter can actually produce, in order.
+    """
+    result = []
+    for enc in preferred:
+        enc = enc.strip().lower()
+        if enc == "gzip" or (enc == "br" and brotli is not None):
+            result.append(enc)
+    return tuple(result)
+
+
+def negotiate(accept_encoding: str, encodings: tuple[str, ...]) -> str | None:
+    """
+    Pick the first server-preferred encoding the client accepts with q > 0.
+    """
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    for enc in encodings:
+        if accepted.get(enc, accepted.get("*", 0.0)) > 0:
+            return enc
+    return None
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 6) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    Compress complete (non-streaming) responses with brotli or gzip when they are
+    at least `minimum_size` bytes. Streaming responses pass through untouched so
+    partial results (e.g. NDJSON events) reach the client immediately.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: Iterable[str] = ("br", "gzip"),
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 6,
+    ) -> None:
+        self.app = app
+        self.encodings = available_encodings(encodings)
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        responder = _CompressionResponder(self, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, send: Send, encoding: str | None) -> None:
+        self.middleware = middleware
+        self.downstream = send
+        self.encoding = encoding
+        self.start_message: Message | None = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self.downstream(message)
+            return
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.start_message is None:
+            await self.downstream(message)
+            return
+
+        start, self.start_message = self.start_message, None
+        if message.get("more_body", False):
+            # Streaming response: forward as-is.
+            self.passthrough = True
+            await self.downstream(start)
+            await self.downstream(message)
+            return
+
+        headers = MutableHeaders(raw=start["headers"])
+        body = message.get("body", b"")
+        if start["status"] == 304:
+            # ETag is left as set by conditional_response, which echoes the stored validator
+            headers.add_vary_header("Accept-Encoding")
+        if start["status"] in (204, 304) or not is_compressible(headers.get("content-type", "")):
+            await self.downstream(start)
+            await self.downstream(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        if self.encoding and "content-encoding" not in headers and len(body) >= self.middleware.minimum_size:
+            body = compress(
+                body,
+                self.encoding,
+                gzip_level=self.middleware.gzip_level,
+                brotli_quality=self.middleware.brotli_quality,
+            )
+            headers["Content-Encoding"] = self.encoding
+            headers["Content-Length"] = str(len(body))
+            if "etag" in headers:
+                headers["ETag"] = etag_for_encoding(headers["etag"], self.encoding)
+            message = {"type": "http.response.body", "body": body, "more_body": False}
+        await self.downstream(start)
+        await self.downstream(message)
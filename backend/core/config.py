@@ -9,9 +9,35 @@ class Settings(BaseSettings):
     firebase_bucket: str = Field("", env="FIREBASE_BUCKET")
     gemini_api_key: str = Field("", env="GEMINI_API_KEY")
     gemini_model: str = Field("gemini-2.0-flash", env="GEMINI_MODEL")
+    gemini_base_url: str = Field("https://generativelanguage.googleapis.com/v1beta", env="GEMINI_BASE_URL")
+    gemini_context_cache_enabled: bool = True
+    gemini_context_cache_ttl_sec: int = 3600
+    # Gemini rejects cached contents below a model-specific size; skip caching smaller prompts
+    gemini_context_cache_min_tokens: int = 1024
     hf_token: str = Field("", env="HF_TOKEN")
+    cv_extractor: str = Field("pypdf2", env="CV_EXTRACTOR")  # pypdf2, pypdfium2, pdfminer
+    cv_prompt_token_budget: int = 1500  # approx. tokens of CV text sent to Gemini
     request_timeout_sec: int = 30
+    db_init_on_startup: bool = True
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: int = 2
+    server_timeout_sec: int = 120
     ai_enabled: bool = True
+    compression_encodings: str = "br,gzip"  # preference order; empty disables compression
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 6
+    interview_shard_size: int = Field(3, ge=1)  # larger question sets are generated as parallel batches of this size
+    interview_shard_concurrency: int = Field(4, ge=1)
+    question_bank_enabled: bool = True
+    question_bank_low_watermark: int = 30  # refill a bucket from Gemini below this many questions
+    question_bank_refill_size: int = 10
+    question_bank_refill_cooldown_sec: int = 900  # after a refill that added under half a batch
+    server_timing_enabled: bool = True  # per-request span breakdown in the Server-Timing header
+    profile_dir: str = ""  # set to capture pyinstrument profiles of slow requests here
+    profile_threshold_ms: int = 2000
+    profile_interval_ms: float = 1.0
 
     class Config:
         env_file = ".env"
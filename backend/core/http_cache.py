@@ -0,0 +1,60 @@
+import hashlib
+import re
+
+from fastapi import Request, Response
+
+# Suffix added by the compression middleware: "abc" -> "abc-gzip"
+_ENCODING_SUFFIX = re.compile(r'-(gzip|br)"$')
+
+
+def make_etag(*parts) -> str:
+    """
+    Strong ETag from the values that identify a resource version.
+    """
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_for_encoding(etag: str, encoding: str) -> str:
+    """
+    Strong validators must differ per content coding (RFC 9110 8.8.1), so a
+    compressed representation gets the coding appended. Weak ETags are kept.
+    """
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def matching_etag(if_none_match: str | None, etag: str) -> str | None:
+    """
+    The If-None-Match entry that matches `etag` (weak comparison, compressed
+    variants included), as the client sent it; None if nothing matches.
+    """
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if _ENCODING_SUFFIX.sub('"', candidate.removeprefix("W/")) == etag:
+            return candidate
+    return None
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    return matching_etag(if_none_match, etag) is not None
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Response | None:
+    """
+    Return a 304 response when the client already holds `etag`; otherwise tag
+    `response` so the client can revalidate next time, and return None.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    matched = matching_etag(request.headers.get("if-none-match"), etag)
+    if matched:
+        # Echo the validator of the representation the client stored, which
+        # carries an encoding suffix only if that 200 was actually compressed
+        return Response(status_code=304, headers={**headers, "ETag": matched})
+    response.headers.update(headers)
+    return None
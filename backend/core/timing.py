@@ -0,0 +1,173 @@
+"""
+Request-scoped timing spans, reported in a `Server-Timing` response header,
+plus an opt-in sampling profiler for slow requests.
+
+Spans are only recorded inside a request handled by `ServerTimingMiddleware`;
+elsewhere `span()` is a single context-variable lookup.
+"""
+import asyncio
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # pyinstrument is optional; only needed for slow-request profiling
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+# name -> [total seconds, call count]; None outside an instrumented request
+_spans: ContextVar[dict[str, list] | None] = ContextVar("server_timing_spans", default=None)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    Add the wall time of the block to the current request's `name` metric.
+
+    Repeated or concurrent spans with the same name are summed, so parallel
+    Gemini calls can report more time than the request took.
+    """
+    spans = _spans.get()
+    if spans is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(spans, name, time.perf_counter() - start)
+
+
+def _record(spans: dict[str, list], name: str, elapsed: float) -> None:
+    entry = spans.get(name)
+    if entry is None:
+        spans[name] = [elapsed, 1]
+    else:
+        entry[0] += elapsed
+        entry[1] += 1
+
+
+def format_server_timing(spans: dict[str, list], total: float) -> str:
+    parts = []
+    for name, (elapsed, count) in spans.items():
+        item = f"{name};dur={elapsed * 1000:.1f}"
+        if count > 1:
+            item += f';desc="{count} calls"'
+        parts.append(item)
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Report time spent executing SQL as the `db` metric.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _spans.get() is not None:
+            conn.info.setdefault("server_timing_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        spans = _spans.get()
+        starts = conn.info.get("server_timing_start")
+        if spans is not None and starts:
+            _record(spans, "db", time.perf_counter() - starts.pop())
+
+
+def profiler_available() -> bool:
+    return Profiler is not None
+
+
+class ServerTimingMiddleware:
+    """
+    Collect spans for each HTTP request and add them as a `Server-Timing` header.
+
+    Only spans finished before the response starts are reported; for streaming
+    responses that is the work done before the first chunk.
+
+    With `profile_dir` set, every request also runs under pyinstrument and
+    requests slower than `profile_threshold_ms` are written there as
+    speedscope files (open with https://www.speedscope.app). Work done in
+    thread pools (PDF parsing, STT) shows up only as the awaiting frame.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        header: bool = True,
+        profile_dir: str | None = None,
+        profile_threshold_ms: int = 2000,
+        profile_interval_ms: float = 1.0,
+    ) -> None:
+        self.app = app
+        self.header = header
+        self.profile_dir = profile_dir if profile_dir and profiler_available() else None
+        self.profile_threshold = profile_threshold_ms / 1000
+        self.profile_interval = profile_interval_ms / 1000
+        if profile_dir and not self.profile_dir:
+            logger.warning("Slow-request profiling requested but pyinstrument is not installed")
+        if self.profile_dir:
+            os.makedirs(self.profile_dir, exist_ok=True)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        spans: dict[str, list] = {}
+        token = _spans.set(spans)
+        start = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.header:
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", format_server_timing(spans, time.perf_counter() - start))
+            await send(message)
+
+        profiler = None
+        if self.profile_dir:
+            profiler = Profiler(interval=self.profile_interval, async_mode="enabled")
+            profiler.start()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _spans.reset(token)
+            if profiler is not None:
+                profiler.stop()
+                elapsed = time.perf_counter() - start
+                if elapsed >= self.profile_threshold:
+                    await asyncio.to_thread(self._write_profile, profiler, scope, elapsed, spans)
+
+    def _write_profile(self, profiler, scope: Scope, elapsed: float, spans: dict[str, list]) -> None:
+        from pyinstrument.renderers import SpeedscopeRenderer
+
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope.get("path", "")).strip("_") or "root"
+        filename = f"{time.strftime('%Y%m%d-%H%M%S')}_{scope.get('method', '')}_{slug}_{elapsed * 1000:.0f}ms.speedscope.json"
+        path = os.path.join(self.profile_dir, filename)
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(profiler.output(renderer=SpeedscopeRenderer()))
+        except Exception:
+            logger.exception("Failed to write request profile %s", path)
+            return
+        logger.warning(
+            "Slow request %s %s took %.0f ms (%s); profile: %s",
+            scope.get("method"),
+            scope.get("path"),
+            elapsed * 1000,
+            format_server_timing(spans, elapsed),
+            path,
+        )
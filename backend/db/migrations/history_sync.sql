@@ -0,0 +1,40 @@
+-- History delta sync (PostgreSQL). create_all() does not alter existing
+-- tables, so databases created before delta sync need this once, with the
+-- API stopped. Safe to re-run.
+
+-- Tombstones and last-change timestamp
+ALTER TABLE histories ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;
+UPDATE histories SET updated_at = created_at WHERE updated_at IS NULL;
+ALTER TABLE histories ALTER COLUMN updated_at SET NOT NULL;
+ALTER TABLE histories ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP;
+
+-- Per-user change sequence used as the sync cursor
+ALTER TABLE users ADD COLUMN IF NOT EXISTS history_seq INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE histories ADD COLUMN IF NOT EXISTS created_seq INTEGER;
+ALTER TABLE histories ADD COLUMN IF NOT EXISTS change_seq INTEGER;
+
+-- Number existing rows per user in change order, continuing after any
+-- sequence values already handed out
+WITH numbered AS (
+    SELECT h.id,
+           COALESCE(m.max_seq, 0) + ROW_NUMBER() OVER (PARTITION BY h.user_id ORDER BY h.updated_at, h.id) AS seq
+    FROM histories h
+    LEFT JOIN (
+        SELECT user_id, MAX(change_seq) AS max_seq FROM histories GROUP BY user_id
+    ) m ON m.user_id = h.user_id
+    WHERE h.user_id IS NOT NULL AND h.change_seq IS NULL
+)
+UPDATE histories h
+SET change_seq = numbered.seq,
+    created_seq = COALESCE(h.created_seq, numbered.seq)
+FROM numbered
+WHERE h.id = numbered.id;
+
+UPDATE users u
+SET history_seq = GREATEST(u.history_seq, s.max_seq)
+FROM (SELECT user_id, MAX(change_seq) AS max_seq FROM histories GROUP BY user_id) s
+WHERE s.user_id = u.id;
+
+-- The index replaces the earlier (user_id, updated_at, id) one of the same name
+DROP INDEX IF EXISTS ix_histories_user_sync;
+CREATE UNIQUE INDEX ix_histories_user_sync ON histories (user_id, change_seq);
@@ -1,16 +1,42 @@
 import uvicorn
 from fastapi import FastAPI
 from backend.core.config import settings
+from backend.core.compression import CompressionMiddleware
+from backend.core.timing import ServerTimingMiddleware, instrument_engine
 from backend.db import session as db_session
 from backend import models
 from backend.routers import ai_router, auth_router, user_router, history_router
 
 
+def init_db() -> None:
+    models.Base.metadata.create_all(bind=db_session.engine)
+
+
 def create_app() -> FastAPI:
     app = FastAPI(title=settings.app_name)
 
-    # DB tables
-    models.Base.metadata.create_all(bind=db_session.engine)
+    # DB tables (the production launcher does this once before forking workers)
+    if settings.db_init_on_startup:
+        init_db()
+
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=settings.compression_encodings.split(","),
+        minimum_size=settings.compression_min_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+
+    # Outermost, so the total includes compression
+    if settings.server_timing_enabled or settings.profile_dir:
+        instrument_engine(db_session.engine)
+        app.add_middleware(
+            ServerTimingMiddleware,
+            header=settings.server_timing_enabled,
+            profile_dir=settings.profile_dir or None,
+            profile_threshold_ms=settings.profile_threshold_ms,
+            profile_interval_ms=settings.profile_interval_ms,
+        )
 
     # Routers
     app.include_router(ai_router.router, prefix=settings.api_prefix)
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, Integer
+from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, Integer, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from backend.db.session import Base
 
@@ -16,17 +16,61 @@ class User(Base):
     experience_level = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Last change_seq handed out to this user's history rows
+    history_seq = Column(Integer, nullable=False, default=0, server_default="0")
 
     histories = relationship("History", back_populates="user")
 
 
 class History(Base):
     __tablename__ = "histories"
+    __table_args__ = (
+        # Delta sync scans a user's rows in change_seq order
+        Index("ix_histories_user_sync", "user_id", "change_seq", unique=True),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=True)  # nullable to support guest uploads if synced
     type = Column(String, nullable=False)  # cv_review, interview_session, career_roadmap
     data = Column(JSON, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    deleted_at = Column(DateTime, nullable=True)  # tombstone: set instead of deleting the row
+    # Per-user counters from User.history_seq: at insert, and at the latest change
+    created_seq = Column(Integer, nullable=True)
+    change_seq = Column(Integer, nullable=True)
 
     user = relationship("User", back_populates="histories")
+
+
+class InterviewQuestionBank(Base):
+    __tablename__ = "interview_question_bank"
+    __table_args__ = (
+        Index(
+            "ix_question_bank_bucket",
+            "job_field",
+            "target_role",
+            "difficulty",
+            "topic",
+            "language",
+        ),
+        UniqueConstraint(
+            "job_field",
+            "target_role",
+            "difficulty",
+            "language",
+            "normalized_text",
+            name="uq_question_bank_text",
+        ),
+    )
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    job_field = Column(String, nullable=False)
+    target_role = Column(String, nullable=False, default="")  # "" when no specific role requested
+    difficulty = Column(String, nullable=False)
+    topic = Column(String, nullable=False)  # technical, behavioral, situational, general
+    language = Column(String, nullable=False)
+    text = Column(String, nullable=False)
+    normalized_text = Column(String, nullable=False)
+    suggested_duration_sec = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
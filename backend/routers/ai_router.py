@@ -1,4 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+import json
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from backend.core.config import settings
+from backend.db.session import get_db
 from backend.schemas import (
     CvReviewRequest,
     CvReviewResponse,
@@ -6,11 +14,14 @@ from backend.schemas import (
     InterviewQuestionsResponse,
     InterviewFeedbackRequest,
     InterviewFeedbackResponse,
+    InterviewFeedbackAnswer,
+    InterviewAudioAnswerRequest,
     CareerRoadmapRequest,
     CareerRoadmapResponse,
 )
 from backend.services.ai import AIService
-from backend.services.stt import transcribe_bytes
+from backend.services import question_bank
+from backend.services.stt import DEFAULT_PROFILE, PROFILE_CHOICES, transcribe_bytes
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
@@ -29,9 +40,13 @@ async def cv_review(
 @router.post("/interview-questions", response_model=InterviewQuestionsResponse)
 async def interview_questions(
     req: InterviewQuestionsRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
     ai_service: AIService = Depends(lambda: AIService()),
 ):
     try:
+        if settings.question_bank_enabled:
+            return await question_bank.serve_questions(db, ai_service, req, background_tasks)
         return await ai_service.interview_questions(req)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -62,10 +77,61 @@ async def career_roadmap(
 @router.post("/stt-interview")
 async def stt_interview(
     audio: UploadFile = File(...),
+    profile: str = Form(DEFAULT_PROFILE),
 ):
+    if profile not in PROFILE_CHOICES:
+        raise HTTPException(status_code=400, detail=f"profile must be one of: {', '.join(PROFILE_CHOICES)}")
     try:
         content = await audio.read()
-        text = transcribe_bytes(content, language="id")
+        text = await run_in_threadpool(transcribe_bytes, content, language="id", profile=profile)
         return {"text": text}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _ndjson(event: dict) -> bytes:
+    return (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+@router.post("/interview-answer-audio")
+async def interview_answer_audio(
+    audio: UploadFile = File(...),
+    payload: str = Form(...),
+    profile: str = Form(DEFAULT_PROFILE),
+    ai_service: AIService = Depends(lambda: AIService()),
+):
+    """
+    Transcribe a spoken answer and score it in one round trip.
+
+    Streams NDJSON: a `transcript` event as soon as STT finishes, then a
+    `feedback` event (or an `error` event naming the failed stage).
+    """
+    if profile not in PROFILE_CHOICES:
+        raise HTTPException(status_code=400, detail=f"profile must be one of: {', '.join(PROFILE_CHOICES)}")
+    try:
+        req = InterviewAudioAnswerRequest.model_validate_json(payload)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    content = await audio.read()
+
+    async def events():
+        try:
+            text = await run_in_threadpool(transcribe_bytes, content, language=req.language, profile=profile)
+        except Exception as e:
+            yield _ndjson({"event": "error", "stage": "stt", "detail": str(e)})
+            return
+        yield _ndjson({"event": "transcript", "text": text})
+        if not text.strip():
+            yield _ndjson({"event": "error", "stage": "stt", "detail": "No speech recognized in audio"})
+            return
+        try:
+            feedback = await ai_service.interview_feedback(
+                InterviewFeedbackRequest(**req.model_dump(), answer=InterviewFeedbackAnswer(text=text))
+            )
+        except Exception as e:
+            yield _ndjson({"event": "error", "stage": "feedback", "detail": str(e)})
+            return
+        yield _ndjson({"event": "feedback", "data": feedback.model_dump(mode="json")})
+
+    # X-Accel-Buffering keeps reverse proxies from holding the transcript until the end
+    return StreamingResponse(events(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
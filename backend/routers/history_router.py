@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from backend.db.session import get_db
-from backend.schemas import HistoryItem
+from backend.schemas import HistoryItem, HistoryChangesResponse
 from backend.services import history as history_service
 from backend import models
 import jwt
 from backend.core.config import settings
+from backend.core.http_cache import conditional_response, make_etag
 
 router = APIRouter(prefix="/db/history", tags=["history"])
 
@@ -26,7 +27,16 @@ def get_current_user(db: Session = Depends(get_db), authorization: str = "") ->
 
 
 @router.get("", response_model=list[HistoryItem])
-def list_history(db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
+def list_history(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+):
+    count, last_changed = history_service.history_fingerprint(db, user.id)
+    not_modified = conditional_response(request, response, make_etag(user.id, last_changed, count))
+    if not_modified:
+        return not_modified
     return history_service.list_history(db, user.id)
 
 
@@ -38,3 +48,28 @@ def add_history(
 ):
     hist = history_service.add_history(db, user.id, payload.type, payload.data)
     return hist
+
+
+@router.get("/changes", response_model=HistoryChangesResponse)
+def history_changes(
+    since: str | None = None,
+    limit: int = Query(500, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+):
+    try:
+        cursor = history_service.decode_cursor(since) if since else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return history_service.list_changes(db, user.id, cursor, limit)
+
+
+@router.delete("/{history_id}")
+def delete_history(
+    history_id: str,
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+):
+    if not history_service.delete_history(db, user.id, history_id):
+        raise HTTPException(status_code=404, detail="History not found")
+    return {"message": "History deleted"}
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from backend.db.session import get_db
 from backend.schemas import UserRead, UserCreate, UserUpdate, UserResponse
 from backend import models
+from backend.core.http_cache import conditional_response, make_etag
 
 router = APIRouter(prefix="/db/user", tags=["user"])
 
@@ -16,10 +17,13 @@ def get_current_user(db: Session = Depends(get_db)) -> models.User:
 
 
 @router.get("", response_model=UserResponse)
-def me(db: Session = Depends(get_db)):
+def me(request: Request, response: Response, db: Session = Depends(get_db)):
     user = db.query(models.User).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    not_modified = conditional_response(request, response, make_etag(user.id, user.updated_at, 1))
+    if not_modified:
+        return not_modified
     return {"user": user}
 
 
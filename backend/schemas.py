@@ -121,6 +121,15 @@ class InterviewFeedbackRequest(BaseModel):
     answer: InterviewFeedbackAnswer
 
 
+# Same as InterviewFeedbackRequest minus the answer, which is transcribed from audio
+class InterviewAudioAnswerRequest(BaseModel):
+    job_field: str
+    target_role: Optional[str] = None
+    difficulty: str
+    language: str = "id"
+    question: InterviewFeedbackQuestion
+
+
 class InterviewFeedbackResponse(BaseModel):
     question_id: Optional[str]
     job_field: str
@@ -170,6 +179,15 @@ class HistoryItem(BaseModel):
     type: str
     data: Any
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         orm_mode = True
+
+
+class HistoryChangesResponse(BaseModel):
+    inserted: List[HistoryItem]
+    updated: List[HistoryItem]
+    deleted: List[str]
+    cursor: Optional[str] = None  # pass back as `since` on the next sync
+    has_more: bool = False
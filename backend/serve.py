@@ -0,0 +1,204 @@
+"""
+Production launcher.
+
+    python -m backend.serve --workers 4
+
+The master process creates the DB schema once, preloads the app (routers,
+services, config) and starts a single STT worker that owns the Whisper model.
+Gunicorn then forks the API workers, which share the preloaded modules and
+reach the STT worker over a Unix socket. A supervisor thread in the master
+restarts the STT worker if it dies.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from multiprocessing.connection import wait
+
+DEFAULT_STT_SOCKET = "/tmp/siapkerja-stt.sock"
+STT_RESTART_DELAY_SEC = 5.0
+
+# Logged through gunicorn's error log so it shows up next to the arbiter's messages
+logger = logging.getLogger("gunicorn.error")
+
+
+def _exited(process: multiprocessing.Process, timeout: float = 0) -> bool:
+    # Gunicorn's arbiter reaps every child of the master, which can leave
+    # is_alive() stale; the sentinel becomes readable on exit regardless.
+    return bool(wait([process.sentinel], timeout))
+
+
+def _wait_for_socket(path: str, process: multiprocessing.Process, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if _exited(process):
+            raise RuntimeError(f"STT worker exited during startup (code {process.exitcode})")
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(path)
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f"STT worker not ready after {timeout:.0f}s")
+
+
+def start_stt_worker(socket_path: str, threads: int, timeout: float) -> multiprocessing.Process:
+    from backend.services import stt_worker
+
+    # spawn: the worker starts from a clean interpreter rather than a copy of the master
+    ctx = multiprocessing.get_context("spawn")
+    process = ctx.Process(
+        target=stt_worker.serve,
+        args=(socket_path, threads),
+        name="siapkerja-stt",
+        daemon=True,
+    )
+    process.start()
+    _wait_for_socket(socket_path, process, timeout)
+    return process
+
+
+class SttSupervisor:
+    """
+    Own the STT worker process: start it, restart it when it exits and stop it.
+    """
+
+    def __init__(self, socket_path: str, threads: int, startup_timeout: float, check_interval: float = 1.0):
+        self.socket_path = socket_path
+        self.threads = threads
+        self.startup_timeout = startup_timeout
+        self.check_interval = check_interval
+        self.process: multiprocessing.Process | None = None
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        from backend.services.stt_worker import socket_in_use
+
+        if socket_in_use(self.socket_path):
+            raise RuntimeError(f"STT socket {self.socket_path} is already in use by another instance")
+        self.process = start_stt_worker(self.socket_path, self.threads, self.startup_timeout)
+        self._thread = threading.Thread(target=self._monitor, name="stt-supervisor", daemon=True)
+        self._thread.start()
+
+    def _monitor(self) -> None:
+        while not self._stopping.is_set():
+            if not _exited(self.process, self.check_interval):
+                continue
+            # A signal sent to the whole process group kills the worker at the same
+            # moment the master starts shutting down; give stop_restarts() time to run.
+            if self._stopping.wait(self.check_interval):
+                break
+            logger.error("STT worker (pid %s) exited; restarting", self.process.pid)
+            while not self._stopping.is_set():
+                try:
+                    self.process = start_stt_worker(self.socket_path, self.threads, self.startup_timeout)
+                    if not self._stopping.is_set():
+                        logger.info("STT worker restarted (pid %s)", self.process.pid)
+                    break
+                except RuntimeError as e:
+                    logger.error("STT worker restart failed: %s", e)
+                    self._stopping.wait(STT_RESTART_DELAY_SEC)
+
+    def stop_restarts(self) -> None:
+        """
+        Leave the worker down if it exits from now on; stop() still cleans up.
+        """
+        self._stopping.set()
+
+    def stop(self) -> None:
+        self.stop_restarts()
+        if self._thread is not None:
+            self._thread.join(timeout=self.startup_timeout)
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join(timeout=10)
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+def run(args: argparse.Namespace) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    os.environ["STT_SOCKET_PATH"] = args.stt_socket
+
+    from backend.core.config import settings
+
+    settings.db_init_on_startup = False
+
+    from backend import main as app_module
+    from backend.db import session as db_session
+
+    app_module.init_db()
+    # Don't hand pooled connections from the master to forked workers
+    db_session.engine.dispose()
+
+    stt = SttSupervisor(args.stt_socket, args.stt_threads, args.stt_startup_timeout)
+    stt.start()
+
+    def post_fork(server, worker):
+        db_session.engine.dispose(close=False)
+
+    def when_ready(server):
+        # The arbiter only queues signals and handles them up to a second later,
+        # then waits for its workers; stop restarting the STT worker right away.
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGQUIT):
+            queue_signal = signal.getsignal(sig)
+
+            def on_shutdown_signal(signum, frame, queue_signal=queue_signal):
+                stt.stop_restarts()
+                queue_signal(signum, frame)
+
+            signal.signal(sig, on_shutdown_signal)
+
+    def on_exit(server):
+        stt.stop_restarts()
+
+    class Application(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": f"{args.host}:{args.port}",
+                "workers": args.workers,
+                "worker_class": "uvicorn.workers.UvicornWorker",
+                "preload_app": True,
+                "timeout": settings.server_timeout_sec,
+                "post_fork": post_fork,
+                "when_ready": when_ready,
+                "on_exit": on_exit,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app_module.app
+
+    try:
+        Application().run()
+    finally:
+        stt.stop()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    from backend.core.config import settings
+
+    parser = argparse.ArgumentParser(description="Run the SiapKerja API with multiple workers")
+    parser.add_argument("--host", default=settings.server_host)
+    parser.add_argument("--port", type=int, default=settings.server_port)
+    parser.add_argument("--workers", type=int, default=settings.server_workers)
+    parser.add_argument("--stt-socket", default=os.getenv("STT_SOCKET_PATH") or DEFAULT_STT_SOCKET)
+    parser.add_argument("--stt-threads", type=int, default=int(os.getenv("STT_WORKER_THREADS", "1")))
+    parser.add_argument("--stt-startup-timeout", type=float, default=600.0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    try:
+        run(parse_args())
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,199 @@
+"""
+Turn raw extracted CV text into a compact, section-aware prompt excerpt.
+
+Steps: normalize whitespace and glyphs, drop page numbers and running
+headers/footers, split into sections by heading, then pack sections into a token budget
+in order of usefulness for a review (experience and skills first, contact
+details last). Packed sections keep their original document order.
+"""
+import math
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List
+
+CHARS_PER_TOKEN = 4  # rough average for Gemini tokenization of Indonesian/English text
+
+SECTION_ALIASES = {
+    "summary": ("ringkasan", "profil", "profil singkat", "tentang saya", "summary", "profile", "about me",
+                "objective", "tujuan karir"),
+    "experience": ("pengalaman", "pengalaman kerja", "riwayat pekerjaan", "pengalaman profesional",
+                   "experience", "work experience", "professional experience", "employment history"),
+    "skills": ("keahlian", "keterampilan", "kemampuan", "skill", "skills", "technical skills", "hard skills",
+               "soft skills"),
+    "education": ("pendidikan", "riwayat pendidikan", "pendidikan formal", "education"),
+    "projects": ("proyek", "portofolio", "projects", "portfolio"),
+    "certifications": ("sertifikasi", "sertifikat", "pelatihan", "lisensi", "certifications", "certificates",
+                       "licenses", "training", "courses"),
+    "awards": ("penghargaan", "prestasi", "awards", "achievements", "honors"),
+    "organization": ("organisasi", "pengalaman organisasi", "kegiatan", "organizations", "volunteering",
+                     "volunteer experience", "leadership"),
+    "languages": ("bahasa", "kemampuan bahasa", "languages"),
+    "contact": ("kontak", "data diri", "informasi pribadi", "contact", "personal information", "personal details"),
+}
+_HEADINGS = {alias: section for section, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+# Most useful first when the budget is tight
+SECTION_PRIORITY = (
+    "experience", "skills", "summary", "education", "projects", "certifications",
+    "awards", "organization", "languages", "header", "other", "contact",
+)
+
+_BULLETS = re.compile(r"^[•●▪■◦‣⁃∙·*]+\s*")
+# Page numbers only: "3", "Halaman 2", "Page 2 of 3", "2 / 3". Longer numbers (years) are content.
+_PAGE_ARTIFACT = re.compile(
+    r"^(\d{1,3}|(halaman|hal\.?|page)\s*\d+(\s*(dari|of|/)\s*\d+)?|\d+\s*(dari|of|/)\s*\d+|curriculum vitae|daftar riwayat hidup)$",
+    re.IGNORECASE,
+)
+# Footer ending in a page number after a separator: "CV - Nama - Halaman 2", "Nama | Page 1 of 3"
+_PAGE_FOOTER = re.compile(
+    r"^.*\s[-–—|•·]\s*(halaman|hal\.?|page)\s*\d+(\s*(dari|of|/)\s*\d+)?$",
+    re.IGNORECASE,
+)
+_EDGE_LINES = 2  # running headers/footers sit in the first/last lines of a page
+
+
+@dataclass
+class CvSection:
+    kind: str
+    heading: str
+    lines: List[str] = field(default_factory=list)
+
+
+@dataclass
+class CompactCv:
+    text: str
+    source_tokens: int
+    estimated_tokens: int
+    included: List[str]
+    dropped: List[str]
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _running_lines(pages: List[List[str]]) -> set:
+    """
+    Casefolded lines that recur at the top or bottom of most pages.
+    """
+    if len(pages) < 2:
+        return set()
+    counts = Counter()
+    for page in pages:
+        counts.update({line.casefold() for line in page[:_EDGE_LINES] + page[-_EDGE_LINES:]})
+    return {key for key, n in counts.items() if n >= 2 and n > len(pages) / 2}
+
+
+def _is_continuation(line: str, bullet: bool, previous: str) -> bool:
+    """
+    Whether `line` is the rest of `previous`, wrapped by the PDF layout. List
+    items (bulleted or comma-separated, e.g. a skills line) and lines after a
+    section heading stand on their own.
+    """
+    return (
+        line[0].islower()
+        and not bullet
+        and "," not in line
+        and _heading_kind(previous) is None
+    )
+
+
+def normalize_lines(raw: str) -> List[str]:
+    """
+    NFKC-normalize, strip bullets and repeated whitespace, and drop empty lines,
+    page numbers and running headers/footers (lines recurring at the edges of
+    most pages; pages are separated by form feeds). Lines wrapped by the PDF
+    layout are rejoined. Other repeated lines, such as dates, are kept.
+    """
+    text = unicodedata.normalize("NFKC", raw).replace("\u00ad", "")
+    pages: List[List[tuple[str, bool]]] = []
+    for page_text in text.split("\f"):
+        page = []
+        for line in page_text.splitlines():
+            line = line.strip()
+            bullet = _BULLETS.match(line) is not None
+            line = " ".join(_BULLETS.sub("", line).split())
+            if not line or _PAGE_ARTIFACT.match(line) or _PAGE_FOOTER.match(line):
+                continue
+            page.append((line, bullet))
+        pages.append(page)
+    running = _running_lines([[line for line, _ in page] for page in pages])
+
+    lines: List[str] = []
+    for page in pages:
+        for line, bullet in page:
+            if line.casefold() in running:
+                continue
+            if lines and _is_continuation(line, bullet, lines[-1]):
+                lines[-1] = f"{lines[-1]} {line}"
+                continue
+            lines.append(line)
+    return lines
+
+
+def _heading_kind(line: str) -> str | None:
+    if len(line.split()) > 4:
+        return None
+    return _HEADINGS.get(line.rstrip(":").strip().casefold())
+
+
+def split_sections(lines: List[str]) -> List[CvSection]:
+    sections = [CvSection(kind="header", heading="")]
+    for line in lines:
+        kind = _heading_kind(line)
+        if kind:
+            sections.append(CvSection(kind=kind, heading=line.rstrip(":").strip()))
+        else:
+            sections[-1].lines.append(line)
+    return [s for s in sections if s.lines]
+
+
+def _render(section: CvSection, lines: List[str]) -> str:
+    body = "\n".join(lines)
+    return f"[{section.heading}]\n{body}" if section.heading else body
+
+
+def compact_cv_text(raw: str, token_budget: int, focus_terms: List[str] | None = None) -> CompactCv:
+    """
+    Pack the most useful CV sections into roughly `token_budget` tokens.
+    Sections mentioning any of `focus_terms` (e.g. the target role) move up one rank.
+    """
+    sections = split_sections(normalize_lines(raw))
+    terms = [t.casefold() for t in (focus_terms or []) if t and len(t) > 2]
+
+    def rank(item):
+        index, section = item
+        priority = SECTION_PRIORITY.index(section.kind) if section.kind in SECTION_PRIORITY else len(SECTION_PRIORITY)
+        body = " ".join(section.lines).casefold()
+        if terms and any(term in body for term in terms):
+            priority -= 1
+        return priority, index
+
+    remaining = token_budget
+    picked: dict[int, List[str]] = {}
+    dropped = []
+    for index, section in sorted(enumerate(sections), key=rank):
+        taken = []
+        cost = estimate_tokens(_render(section, []))
+        for line in section.lines:
+            line_cost = estimate_tokens(line) + 1
+            if cost + line_cost > remaining:
+                break
+            taken.append(line)
+            cost += line_cost
+        if taken:
+            picked[index] = taken
+            remaining -= cost
+        if len(taken) < len(section.lines):
+            dropped.append(section.heading or section.kind)
+
+    text = "\n\n".join(_render(sections[i], picked[i]) for i in sorted(picked))
+    return CompactCv(
+        text=text,
+        source_tokens=estimate_tokens(raw),
+        estimated_tokens=estimate_tokens(text),
+        included=[sections[i].heading or sections[i].kind for i in sorted(picked)],
+        dropped=dropped,
+    )
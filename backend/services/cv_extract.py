@@ -0,0 +1,115 @@
+"""
+PDF text extraction backends for CV review.
+
+The backend is chosen per deployment with CV_EXTRACTOR; compare them with
+`python -m backend.benchmarks.bench_cv_extract`. Every backend separates pages
+with a form feed ("\f"), as pdfminer does.
+"""
+import io
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+
+class CvTextExtractor(ABC):
+    """
+    Backends import their PDF library when constructed, so a missing library
+    fails when the extractor is looked up rather than on the first CV.
+    """
+    name = ""
+
+    @abstractmethod
+    def extract(self, pdf_bytes: bytes) -> str:
+        ...
+
+    @abstractmethod
+    def page_count(self, pdf_bytes: bytes) -> int:
+        ...
+
+
+class PyPDF2Extractor(CvTextExtractor):
+    name = "pypdf2"
+
+    def __init__(self) -> None:
+        from PyPDF2 import PdfReader
+
+        self._reader = PdfReader
+
+    def extract(self, pdf_bytes: bytes) -> str:
+        with io.BytesIO(pdf_bytes) as fh:
+            reader = self._reader(fh)
+            texts = []
+            for page in reader.pages:
+                page_text = page.extract_text()
+                if page_text:
+                    texts.append(page_text)
+            return "\f".join(texts)
+
+    def page_count(self, pdf_bytes: bytes) -> int:
+        with io.BytesIO(pdf_bytes) as fh:
+            return len(self._reader(fh).pages)
+
+
+class PdfiumExtractor(CvTextExtractor):
+    name = "pypdfium2"
+
+    def __init__(self) -> None:
+        import pypdfium2
+
+        self._pdfium = pypdfium2
+
+    def extract(self, pdf_bytes: bytes) -> str:
+        pdf = self._pdfium.PdfDocument(pdf_bytes)
+        try:
+            texts = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                page_text = textpage.get_text_bounded()
+                textpage.close()
+                page.close()
+                if page_text:
+                    texts.append(page_text)
+            return "\f".join(texts)
+        finally:
+            pdf.close()
+
+    def page_count(self, pdf_bytes: bytes) -> int:
+        pdf = self._pdfium.PdfDocument(pdf_bytes)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+
+class PdfminerExtractor(CvTextExtractor):
+    name = "pdfminer"
+
+    def __init__(self) -> None:
+        from pdfminer.high_level import extract_text
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfpage import PDFPage
+
+        self._extract_text = extract_text
+        self._laparams = LAParams
+        self._pages = PDFPage.get_pages
+
+    def extract(self, pdf_bytes: bytes) -> str:
+        # LAParams groups text into boxes, which keeps multi-column layouts in reading order
+        with io.BytesIO(pdf_bytes) as fh:
+            return self._extract_text(fh, laparams=self._laparams())
+
+    def page_count(self, pdf_bytes: bytes) -> int:
+        with io.BytesIO(pdf_bytes) as fh:
+            return sum(1 for _ in self._pages(fh))
+
+
+EXTRACTORS: dict[str, type[CvTextExtractor]] = {
+    cls.name: cls for cls in (PyPDF2Extractor, PdfiumExtractor, PdfminerExtractor)
+}
+
+
+@lru_cache(maxsize=None)
+def get_extractor(name: str) -> CvTextExtractor:
+    try:
+        return EXTRACTORS[name.strip().lower()]()
+    except KeyError:
+        raise ValueError(f"Unknown CV extractor '{name}', expected one of: {', '.join(EXTRACTORS)}")
@@ -0,0 +1,112 @@
+"""
+Per-process registry of Gemini cachedContents for static system prompts.
+
+Each (base_url, model, system prompt) gets one cached content that requests
+refer to by name instead of resending the instruction. Entries are renewed
+shortly before they expire; when caching fails (prompt below Gemini's minimum
+cacheable size, quota, API unavailable) the caller falls back to sending the
+instruction inline, and creation is not retried for a while.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Dict, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str, str]  # (base_url, model, sha256 of system prompt)
+
+
+class ContextCache:
+    def __init__(
+        self,
+        ttl_sec: int = 3600,
+        renew_margin_sec: int = 120,
+        retry_after_sec: int = 600,
+        min_tokens: int = 0,
+    ):
+        self.ttl_sec = ttl_sec
+        self.renew_margin_sec = renew_margin_sec
+        self.retry_after_sec = retry_after_sec
+        self.min_tokens = min_tokens
+        self._entries: Dict[CacheKey, Tuple[str, float]] = {}  # -> (cache name, monotonic expiry)
+        self._unavailable_until: Dict[CacheKey, float] = {}
+        self._locks: Dict[CacheKey, asyncio.Lock] = {}
+
+    @staticmethod
+    def key(base_url: str, model: str, system_prompt: str) -> CacheKey:
+        return base_url, model, hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+
+    def invalidate(self, key: CacheKey) -> None:
+        self._entries.pop(key, None)
+
+    async def get_name(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        api_key: str,
+        model: str,
+        system_prompt: str,
+    ) -> str | None:
+        """
+        Cache name to send as `cachedContent`, or None to send the prompt inline.
+        """
+        if len(system_prompt) / 4 < self.min_tokens:
+            return None
+        key = self.key(base_url, model, system_prompt)
+        name = self._fresh(key)
+        if name or self._unavailable_until.get(key, 0) > time.monotonic():
+            return name
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            name = self._fresh(key)
+            if name:
+                return name
+            try:
+                name = await self._renew_or_create(client, base_url, api_key, model, system_prompt, key)
+            except (httpx.HTTPError, KeyError, ValueError) as e:
+                logger.warning("Gemini context cache unavailable for %s, sending prompt inline: %s", model, e)
+                self._unavailable_until[key] = time.monotonic() + self.retry_after_sec
+                return None
+            self._entries[key] = (name, time.monotonic() + self.ttl_sec)
+            return name
+
+    def _fresh(self, key: CacheKey) -> str | None:
+        entry = self._entries.get(key)
+        if entry and entry[1] - time.monotonic() > self.renew_margin_sec:
+            return entry[0]
+        return None
+
+    async def _renew_or_create(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        api_key: str,
+        model: str,
+        system_prompt: str,
+        key: CacheKey,
+    ) -> str:
+        ttl = f"{self.ttl_sec}s"
+        previous = self._entries.get(key)
+        if previous and previous[1] > time.monotonic():
+            # Still alive: extend it rather than uploading the prompt again
+            resp = await client.patch(
+                f"{base_url}/{previous[0]}",
+                params={"key": api_key, "updateMask": "ttl"},
+                json={"ttl": ttl},
+            )
+            if resp.is_success:
+                return previous[0]
+        resp = await client.post(
+            f"{base_url}/cachedContents",
+            params={"key": api_key},
+            json={
+                "model": f"models/{model}",
+                "systemInstruction": {"parts": [{"text": system_prompt}]},
+                "ttl": ttl,
+            },
+        )
+        resp.raise_for_status()
+        return resp.json()["name"]
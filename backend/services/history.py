@@ -1,11 +1,35 @@
+import base64
+from datetime import datetime
+from sqlalchemy import case, func, update
 from sqlalchemy.orm import Session
 from backend import models
-from backend.schemas import HistoryItem
-from typing import List
+from backend.schemas import HistoryItem, HistoryChangesResponse
+from typing import List, Tuple
+
+SyncCursor = int  # change_seq of the last change the client has seen
+
+
+def _next_change_seq(db: Session, user_id: str) -> int:
+    """
+    Bump the user's change counter in the database. The UPDATE holds the user's
+    row lock until commit, so a user's changes commit in change_seq order and a
+    client's cursor can't get ahead of a change that is still uncommitted.
+    """
+    User = models.User
+    return db.execute(
+        update(User)
+        .where(User.id == user_id)
+        # Keep updated_at: the counter is sync bookkeeping, not a profile change
+        .values(history_seq=User.history_seq + 1, updated_at=User.updated_at)
+        .returning(User.history_seq)
+    ).scalar_one()
 
 
 def add_history(db: Session, user_id: str | None, type_: str, data: dict) -> models.History:
-    history = models.History(user_id=user_id, type=type_, data=data)
+    now = datetime.utcnow()
+    history = models.History(user_id=user_id, type=type_, data=data, created_at=now, updated_at=now)
+    if user_id:
+        history.created_seq = history.change_seq = _next_change_seq(db, user_id)
     db.add(history)
     db.commit()
     db.refresh(history)
@@ -16,6 +40,109 @@ def list_history(db: Session, user_id: str) -> List[models.History]:
     return (
         db.query(models.History)
         .filter(models.History.user_id == user_id)
+        .filter(models.History.deleted_at.is_(None))
         .order_by(models.History.created_at.desc())
         .all()
     )
+
+
+def delete_history(db: Session, user_id: str, history_id: str) -> bool:
+    """
+    Soft-delete a history item, leaving a tombstone for delta sync.
+    """
+    history = (
+        db.query(models.History)
+        .filter(models.History.id == history_id)
+        .filter(models.History.user_id == user_id)
+        .filter(models.History.deleted_at.is_(None))
+        .first()
+    )
+    if not history:
+        return False
+    now = datetime.utcnow()
+    history.deleted_at = now
+    history.updated_at = now
+    history.change_seq = _next_change_seq(db, user_id)
+    db.commit()
+    return True
+
+
+def history_fingerprint(db: Session, user_id: str) -> Tuple[int, datetime | None]:
+    """
+    (live row count, latest updated_at incl. tombstones) for a user's history;
+    changes whenever the list does.
+    """
+    count, last_changed = (
+        db.query(
+            func.count(case((models.History.deleted_at.is_(None), 1))),
+            func.max(models.History.updated_at),
+        )
+        .filter(models.History.user_id == user_id)
+        .one()
+    )
+    return count, last_changed
+
+
+def encode_cursor(cursor: SyncCursor) -> str:
+    raw = f"seq:{cursor}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(value: str) -> SyncCursor:
+    """
+    Raises ValueError for cursors not issued by `encode_cursor`.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode("utf-8")
+        prefix, seq = raw.split(":", 1)
+        if prefix != "seq":
+            raise ValueError(prefix)
+        return int(seq)
+    except Exception:
+        raise ValueError("Invalid sync cursor")
+
+
+def list_changes(
+    db: Session,
+    user_id: str,
+    since: SyncCursor | None,
+    limit: int = 500,
+) -> HistoryChangesResponse:
+    """
+    Items inserted, updated or deleted after `since`, in change_seq order.
+    Without a cursor this is a full sync of live items.
+    """
+    History = models.History
+    query = db.query(History).filter(History.user_id == user_id)
+    if since is not None:
+        query = query.filter(History.change_seq > since)
+    else:
+        query = query.filter(History.deleted_at.is_(None))
+    # Rows missing a seq (not backfilled, see db/migrations/history_sync.sql) come first
+    rows = query.order_by(History.change_seq.asc().nullsfirst()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    inserted, updated, deleted = [], [], []
+    for row in rows:
+        created_after_cursor = since is None or (row.created_seq or 0) > since
+        if row.deleted_at is not None:
+            if not created_after_cursor:
+                deleted.append(row.id)
+        elif created_after_cursor:
+            inserted.append(HistoryItem.model_validate(row, from_attributes=True))
+        else:
+            updated.append(HistoryItem.model_validate(row, from_attributes=True))
+
+    if rows:
+        last_seq = rows[-1].change_seq
+        cursor = encode_cursor(last_seq if last_seq is not None else since or 0)
+    else:
+        cursor = encode_cursor(since) if since is not None else None
+    return HistoryChangesResponse(
+        inserted=inserted,
+        updated=updated,
+        deleted=deleted,
+        cursor=cursor,
+        has_more=has_more,
+    )
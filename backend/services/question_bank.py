@@ -0,0 +1,269 @@
+import asyncio
+import logging
+import random
+import time
+import uuid
+from typing import Dict, List, Tuple
+
+from fastapi import BackgroundTasks
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.core.config import settings
+from backend.db.session import SessionLocal
+from backend.schemas import (
+    InterviewQuestionsRequest,
+    InterviewQuestionsResponse,
+    InterviewQuestionPayload,
+)
+from backend.services.text_utils import normalize_question_text
+
+logger = logging.getLogger(__name__)
+
+BucketKey = Tuple[str, str, str, str]  # (job_field, target_role, difficulty, language)
+
+_TOPIC_ALIASES = {
+    "technical": "technical",
+    "teknis": "technical",
+    "behavioral": "behavioral",
+    "behavioural": "behavioral",
+    "perilaku": "behavioral",
+    "situational": "situational",
+    "situasional": "situational",
+}
+
+# Buckets with a Gemini refill already running in this process
+_refilling: set[BucketKey] = set()
+# Bucket -> time.monotonic() before which it is not refilled again in this process
+_refill_cooldown_until: Dict[BucketKey, float] = {}
+
+
+def normalize_topic(topic: str | None) -> str:
+    if not topic:
+        return "general"
+    return _TOPIC_ALIASES.get(topic.strip().casefold(), "general")
+
+
+def bucket_key(req: InterviewQuestionsRequest) -> BucketKey:
+    return (
+        req.job_field.strip().casefold(),
+        (req.target_role or "").strip().casefold(),
+        req.difficulty.strip().casefold(),
+        req.language.strip().casefold(),
+    )
+
+
+def _bucket_query(db: Session, key: BucketKey, *columns):
+    job_field, target_role, difficulty, language = key
+    QB = models.InterviewQuestionBank
+    return (
+        db.query(*(columns or (QB,)))
+        .filter(QB.job_field == job_field)
+        .filter(QB.target_role == target_role)
+        .filter(QB.difficulty == difficulty)
+        .filter(QB.language == language)
+    )
+
+
+def count_by_topic(db: Session, key: BucketKey) -> Dict[str, int]:
+    QB = models.InterviewQuestionBank
+    rows = _bucket_query(db, key, QB.topic, func.count(QB.id)).group_by(QB.topic).all()
+    return {topic: count for topic, count in rows}
+
+
+def _balanced_quotas(inventory: Dict[str, int], n: int) -> Dict[str, int]:
+    """
+    Spread n picks round-robin over the available topics, in random topic order.
+    """
+    topics = [t for t, count in inventory.items() if count > 0]
+    random.shuffle(topics)
+    quotas = {t: 0 for t in topics}
+    remaining = n
+    while remaining > 0:
+        progressed = False
+        for topic in topics:
+            if remaining and quotas[topic] < inventory[topic]:
+                quotas[topic] += 1
+                remaining -= 1
+                progressed = True
+        if not progressed:
+            break
+    return quotas
+
+
+def sample_questions(
+    db: Session,
+    key: BucketKey,
+    n: int,
+    inventory: Dict[str, int],
+) -> List[InterviewQuestionPayload]:
+    QB = models.InterviewQuestionBank
+    picked: List[models.InterviewQuestionBank] = []
+    for topic, quota in _balanced_quotas(inventory, n).items():
+        if quota:
+            picked.extend(
+                _bucket_query(db, key)
+                .filter(QB.topic == topic)
+                .order_by(func.random())
+                .limit(quota)
+                .all()
+            )
+    random.shuffle(picked)
+    return [
+        InterviewQuestionPayload(
+            id=f"q{i}",
+            text=row.text,
+            topic=row.topic.capitalize(),
+            suggested_duration_sec=row.suggested_duration_sec,
+        )
+        for i, row in enumerate(picked, start=1)
+    ]
+
+
+def add_questions(db: Session, key: BucketKey, questions: List[InterviewQuestionPayload]) -> int:
+    """
+    Store generated questions in the bank, skipping ones already present in the bucket.
+    Returns the number of new rows.
+    """
+    QB = models.InterviewQuestionBank
+    job_field, target_role, difficulty, language = key
+    candidates: Dict[str, InterviewQuestionPayload] = {}
+    for q in questions:
+        normalized = normalize_question_text(q.text)
+        if normalized and normalized not in candidates:
+            candidates[normalized] = q
+    if not candidates:
+        return 0
+    existing = {
+        normalized
+        for (normalized,) in _bucket_query(db, key, QB.normalized_text)
+        .filter(QB.normalized_text.in_(list(candidates)))
+        .all()
+    }
+    rows = [
+        QB(
+            job_field=job_field,
+            target_role=target_role,
+            difficulty=difficulty,
+            topic=normalize_topic(q.topic),
+            language=language,
+            text=q.text.strip(),
+            normalized_text=normalized,
+            suggested_duration_sec=q.suggested_duration_sec,
+        )
+        for normalized, q in candidates.items()
+        if normalized not in existing
+    ]
+    db.add_all(rows)
+    try:
+        db.commit()
+        return len(rows)
+    except IntegrityError:
+        # Another worker stored some of the same questions concurrently; insert one by one.
+        db.rollback()
+        added = 0
+        for row in rows:
+            db.add(row)
+            try:
+                db.commit()
+                added += 1
+            except IntegrityError:
+                db.rollback()
+        return added
+
+
+def _store_in_new_session(key: BucketKey, questions: List[InterviewQuestionPayload]) -> int:
+    db = SessionLocal()
+    try:
+        return add_questions(db, key, questions)
+    finally:
+        db.close()
+
+
+def _refill_due(key: BucketKey) -> bool:
+    if key in _refilling:
+        return False
+    until = _refill_cooldown_until.get(key)
+    if until is None:
+        return True
+    if time.monotonic() < until:
+        return False
+    del _refill_cooldown_until[key]
+    return True
+
+
+async def refill_bucket(ai_service, req: InterviewQuestionsRequest) -> None:
+    """
+    Top up a bucket with a fresh batch from Gemini. Runs as a background task,
+    at most once per bucket at a time in this process.
+
+    A refill that fails or adds fewer than half a batch (Gemini keeps repeating
+    questions already in the bucket) puts the bucket on cooldown, so a bucket
+    stuck below the low watermark doesn't call Gemini on every request.
+    """
+    key = bucket_key(req)
+    if not _refill_due(key):
+        return
+    _refilling.add(key)
+    added = 0
+    try:
+        refill_req = req.model_copy(update={"num_questions": settings.question_bank_refill_size})
+        generated = await ai_service.interview_questions(refill_req)
+        added = await asyncio.to_thread(_store_in_new_session, key, generated.questions)
+    except Exception:
+        logger.exception("Question bank refill failed for %s", key)
+    finally:
+        _refilling.discard(key)
+    if added * 2 < settings.question_bank_refill_size:
+        _refill_cooldown_until[key] = time.monotonic() + settings.question_bank_refill_cooldown_sec
+        logger.info(
+            "Question bank refill for %s added %d new questions; next refill in %ds",
+            key,
+            added,
+            settings.question_bank_refill_cooldown_sec,
+        )
+
+
+def _sample_if_stocked(
+    db: Session, key: BucketKey, n: int
+) -> Tuple[int, List[InterviewQuestionPayload] | None]:
+    """
+    Bucket size, plus `n` sampled questions if the bucket holds that many.
+    """
+    inventory = count_by_topic(db, key)
+    total = sum(inventory.values())
+    if total < n:
+        return total, None
+    return total, sample_questions(db, key, n, inventory)
+
+
+async def serve_questions(
+    db: Session,
+    ai_service,
+    req: InterviewQuestionsRequest,
+    background_tasks: BackgroundTasks,
+) -> InterviewQuestionsResponse:
+    """
+    Answer from the question bank when the bucket holds enough questions; otherwise
+    generate synchronously and keep the result. Buckets below the low watermark are
+    refilled in the background after the response is sent.
+    """
+    key = bucket_key(req)
+    # Blocking DB work runs in a thread so Gemini calls and streams on this worker keep going
+    total, questions = await asyncio.to_thread(_sample_if_stocked, db, key, req.num_questions)
+    if questions is None:
+        generated = await ai_service.interview_questions(req)
+        total += await asyncio.to_thread(add_questions, db, key, generated.questions)
+        questions = generated.questions
+    if total < settings.question_bank_low_watermark and _refill_due(key):
+        background_tasks.add_task(refill_bucket, ai_service, req)
+    return InterviewQuestionsResponse(
+        session_template_id=str(uuid.uuid4()),
+        job_field=req.job_field,
+        target_role=req.target_role,
+        difficulty=req.difficulty,
+        language=req.language,
+        questions=questions,
+    )
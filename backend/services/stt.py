@@ -1,39 +1,174 @@
+import io
 import os
-import tempfile
-from typing import Optional
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, Tuple
 
 from faster_whisper import WhisperModel
+from faster_whisper.audio import decode_audio
+
+from backend.core.timing import span
 
 MODEL_ID = os.getenv("STT_MODEL_ID", "cahya/faster-whisper-medium-id")
 DEVICE = os.getenv("STT_DEVICE", "cpu")  # set to "cuda" if GPU available
 COMPUTE_TYPE = os.getenv("STT_COMPUTE_TYPE", "int8")  # e.g., "float16" on GPU
+# When set, transcription is delegated to the shared STT worker (see backend/serve.py)
+SOCKET_PATH = os.getenv("STT_SOCKET_PATH", "")
+CLIENT_TIMEOUT_SEC = float(os.getenv("STT_CLIENT_TIMEOUT_SEC", "300"))
+DEFAULT_PROFILE = os.getenv("STT_DEFAULT_PROFILE", "auto")
+SAMPLING_RATE = 16000
+
+# "auto" picks a faster profile for long clips or when other transcriptions are queued.
+# Clip thresholds target ~15 s of decoding on an 8-thread CPU with the int8 medium
+# model: faster-whisper's published CPU benchmark gives RTF ~0.13 for small (beam 5),
+# ~0.4 for medium by parameter count, ~0.3 with beam 2. Recalibrate for the deployed
+# hardware with `bench_stt --latency-budget 15`; 0 disables a threshold.
+AUTO_SHORT_CLIP_SEC = float(os.getenv("STT_AUTO_SHORT_CLIP_SEC", "40"))
+AUTO_LONG_CLIP_SEC = float(os.getenv("STT_AUTO_LONG_CLIP_SEC", "50"))
+AUTO_BUSY_QUEUE = int(os.getenv("STT_AUTO_BUSY_QUEUE", "2"))
+
+
+@dataclass(frozen=True)
+class DecodingProfile:
+    name: str
+    model_id: str
+    compute_type: str
+    beam_size: int
+    best_of: int
+    vad_filter: bool = True
+    condition_on_previous_text: bool = True
+
+
+def _profile(name: str, **decoding) -> DecodingProfile:
+    """
+    Build a profile whose model can be overridden with STT_<NAME>_MODEL_ID /
+    STT_<NAME>_COMPUTE_TYPE, falling back to STT_MODEL_ID / STT_COMPUTE_TYPE.
+    """
+    prefix = f"STT_{name.upper()}_"
+    return DecodingProfile(
+        name=name,
+        model_id=os.getenv(prefix + "MODEL_ID", MODEL_ID),
+        compute_type=os.getenv(prefix + "COMPUTE_TYPE", COMPUTE_TYPE),
+        **decoding,
+    )
+
+
+PROFILES: Dict[str, DecodingProfile] = {
+    "fast": _profile("fast", beam_size=1, best_of=1, condition_on_previous_text=False),
+    "balanced": _profile("balanced", beam_size=2, best_of=2),
+    "accurate": _profile("accurate", beam_size=5, best_of=5),
+}
+PROFILE_CHOICES = ("auto", *PROFILES)
+
+_models: Dict[Tuple[str, str], WhisperModel] = {}
+_model_lock = threading.Lock()
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+
+
+def get_model(profile: DecodingProfile) -> WhisperModel:
+    key = (profile.model_id, profile.compute_type)
+    with _model_lock:
+        if key not in _models:
+            _models[key] = WhisperModel(
+                profile.model_id,
+                device=DEVICE,
+                compute_type=profile.compute_type,
+            )
+        return _models[key]
+
+
+def preload_models() -> None:
+    for profile in PROFILES.values():
+        get_model(profile)
+
+
+if not SOCKET_PATH:
+    # Load once at module import to avoid cold start per request
+    preload_models()
 
-# Load once at module import to avoid cold start per request
-whisper_model = WhisperModel(
-    MODEL_ID,
-    device=DEVICE,
-    compute_type=COMPUTE_TYPE,
-)
 
+def choose_profile(duration_sec: float, queue_depth: int) -> str:
+    long_clip = AUTO_LONG_CLIP_SEC > 0 and duration_sec >= AUTO_LONG_CLIP_SEC
+    short_clip = AUTO_SHORT_CLIP_SEC <= 0 or duration_sec < AUTO_SHORT_CLIP_SEC
+    if queue_depth >= AUTO_BUSY_QUEUE or long_clip:
+        return "fast"
+    if queue_depth > 0 or not short_clip:
+        return "balanced"
+    return "accurate"
 
-def transcribe_bytes(audio_bytes: bytes, language: str = "id") -> str:
+
+def resolve_profile(name: str, duration_sec: float, queue_depth: int) -> DecodingProfile:
+    if name == "auto":
+        name = choose_profile(duration_sec, queue_depth)
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown STT profile '{name}', expected one of: {', '.join(PROFILE_CHOICES)}")
+
+
+@contextmanager
+def _track_in_flight() -> Iterator[int]:
     """
-    Transcribe audio bytes (wav/m4a/etc.) using faster-whisper.
+    Count concurrent transcriptions; yields how many others were already running.
     """
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-        tmp.write(audio_bytes)
-        tmp_path = tmp.name
+    global _in_flight
+    with _in_flight_lock:
+        others = _in_flight
+        _in_flight += 1
     try:
-        segments, _ = whisper_model.transcribe(
-            tmp_path,
+        yield others
+    finally:
+        with _in_flight_lock:
+            _in_flight -= 1
+
+
+def transcribe_local(
+    audio_bytes: bytes,
+    language: str = "id",
+    profile: str = DEFAULT_PROFILE,
+    queue_depth: int | None = None,
+) -> str:
+    """
+    Transcribe audio bytes with the model(s) loaded in this process.
+
+    `queue_depth` is how many requests are ahead of this one; the STT worker
+    passes its own count since requests waiting for an executor thread never
+    reach this function. When omitted, concurrent calls in this process are counted.
+    """
+    audio = decode_audio(io.BytesIO(audio_bytes), sampling_rate=SAMPLING_RATE)
+    with _track_in_flight() as in_flight:
+        depth = in_flight if queue_depth is None else queue_depth
+        chosen = resolve_profile(profile, len(audio) / SAMPLING_RATE, depth)
+        segments, _ = get_model(chosen).transcribe(
+            audio,
             language=language,
-            beam_size=5,
-            vad_filter=True,
+            beam_size=chosen.beam_size,
+            best_of=chosen.best_of,
+            vad_filter=chosen.vad_filter,
+            condition_on_previous_text=chosen.condition_on_previous_text,
         )
-        text = " ".join(seg.text for seg in segments).strip()
-        return text
-    finally:
-        try:
-            os.remove(tmp_path)
-        except OSError:
-            pass
+        # segments is lazy; decoding happens while joining
+        return " ".join(seg.text for seg in segments).strip()
+
+
+def transcribe_bytes(audio_bytes: bytes, language: str = "id", profile: str = DEFAULT_PROFILE) -> str:
+    """
+    Transcribe audio bytes (wav/m4a/etc.) using faster-whisper, either in-process
+    or through the shared STT worker when STT_SOCKET_PATH is set.
+
+    `profile` is one of PROFILE_CHOICES; "auto" picks by clip length and queue depth.
+    """
+    with span("stt"):
+        if SOCKET_PATH:
+            from backend.services import stt_worker
+
+            return stt_worker.request_transcription(
+                SOCKET_PATH,
+                audio_bytes,
+                language=language,
+                profile=profile,
+                timeout=CLIENT_TIMEOUT_SEC,
+            )
+        return transcribe_local(audio_bytes, language=language, profile=profile)
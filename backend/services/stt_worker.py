@@ -0,0 +1,143 @@
+"""
+Shared speech-to-text worker.
+
+One process owns the Whisper model and serves every API worker over a local
+Unix socket, so memory does not grow with a model copy per API worker.
+
+Wire format, both directions: 4-byte big-endian length + payload.
+Request: JSON header frame ({"language": ..., "profile": ...}) followed by an audio frame.
+Response: one JSON frame, {"text": ...} or {"error": ...}.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct("!I")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+
+def _frame(payload: bytes) -> bytes:
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("STT worker closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def request_transcription(
+    socket_path: str,
+    audio_bytes: bytes,
+    language: str = "id",
+    profile: str = "auto",
+    timeout: float | None = None,
+) -> str:
+    """
+    Client side: send audio to the STT worker and block until the transcript arrives.
+    """
+    header = json.dumps({"language": language, "profile": profile}).encode("utf-8")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(_frame(header) + _frame(audio_bytes))
+        (size,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+        response = json.loads(_recv_exact(sock, size))
+    if "error" in response:
+        raise RuntimeError(f"STT worker error: {response['error']}")
+    return response["text"]
+
+
+def socket_in_use(socket_path: str) -> bool:
+    """
+    True if something is accepting connections on `socket_path`; a leftover
+    file from a crashed worker refuses the connection.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> bytes:
+    (size,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    if size > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame too large: {size} bytes")
+    return await reader.readexactly(size)
+
+
+async def _serve(socket_path: str, threads: int) -> None:
+    from backend.services import stt
+
+    if socket_in_use(socket_path):
+        raise RuntimeError(f"Another STT worker is already listening on {socket_path}")
+    # Load before binding so the socket only appears once the worker is ready.
+    stt.preload_models()
+    executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="stt")
+    loop = asyncio.get_running_loop()
+    # Accepted requests not yet answered, running or waiting for an executor thread
+    pending = 0
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        nonlocal pending
+        try:
+            header = json.loads(await _read_frame(reader))
+            audio = await _read_frame(reader)
+        except asyncio.IncompleteReadError:
+            # Readiness probe or client gone before sending a request
+            writer.close()
+            return
+        queue_depth = pending
+        pending += 1
+        try:
+            text = await loop.run_in_executor(
+                executor,
+                stt.transcribe_local,
+                audio,
+                header.get("language", "id"),
+                header.get("profile", stt.DEFAULT_PROFILE),
+                queue_depth,
+            )
+            response = {"text": text}
+        except Exception as e:
+            logger.exception("Transcription failed")
+            response = {"error": str(e)}
+        finally:
+            pending -= 1
+        try:
+            writer.write(_frame(json.dumps(response).encode("utf-8")))
+            await writer.drain()
+        finally:
+            writer.close()
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)  # stale file left by a worker that was killed
+    server = await asyncio.start_unix_server(handle, path=socket_path)
+    logger.info("STT worker listening on %s", socket_path)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def serve(socket_path: str, threads: int = 1) -> None:
+    """
+    Process entry point: load the model and serve until terminated.
+    """
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_serve(socket_path, threads))
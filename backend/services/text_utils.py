@@ -0,0 +1,15 @@
+"""
+Text helpers shared by services that must not depend on each other
+(e.g. the AI service and the DB-backed question bank).
+"""
+import re
+import unicodedata
+
+
+def normalize_question_text(text: str) -> str:
+    """
+    Canonical form used to deduplicate questions: case/punctuation/whitespace-insensitive.
+    """
+    folded = unicodedata.normalize("NFKC", text).casefold()
+    folded = re.sub(r"[^\w\s]", " ", folded)
+    return " ".join(folded.split())
@@ -0,0 +1,49 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("faster_whisper")
+# Keep stt from loading the Whisper models at import
+os.environ.setdefault("STT_SOCKET_PATH", os.path.join(tempfile.gettempdir(), "siapkerja-stt-test.sock"))
+
+from backend.services import stt, stt_worker  # noqa: E402
+
+
+class _Segment:
+    def __init__(self, text):
+        self.text = text
+
+
+class _SlowModel:
+    def transcribe(self, audio, beam_size, **kwargs):
+        time.sleep(0.3)
+        return iter([_Segment(str(beam_size))]), None
+
+
+def test_auto_profile_sees_worker_queue(monkeypatch, tmp_path):
+    monkeypatch.setattr(stt, "preload_models", lambda: None)
+    monkeypatch.setattr(stt, "get_model", lambda profile: _SlowModel())
+    # 5 s of silence: short enough that only the queue can change the choice
+    monkeypatch.setattr(stt, "decode_audio", lambda f, sampling_rate: [0.0] * (5 * sampling_rate))
+    socket_path = str(tmp_path / "stt.sock")
+
+    threading.Thread(target=asyncio.run, args=(stt_worker._serve(socket_path, 1),), daemon=True).start()
+    deadline = time.monotonic() + 5
+    while not os.path.exists(socket_path):
+        assert time.monotonic() < deadline, "STT worker did not start"
+        time.sleep(0.01)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        beams = list(pool.map(
+            lambda _: stt_worker.request_transcription(socket_path, b"audio", profile="auto", timeout=10),
+            range(6),
+        ))
+
+    beam = {name: str(p.beam_size) for name, p in stt.PROFILES.items()}
+    assert beams.count(beam["accurate"]) == 1
+    assert beam["fast"] in beams